@@ -0,0 +1,206 @@
+import csv
+import json
+import os
+import time
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import func, text, select, delete, update
+
+from models import User, ShoutOut, ShoutOutRecipient, Reaction, Comment, AdminLog, Job
+from jobs import job_handler, artifact_path
+from user_index import user_index
+from provisioning import parse_users, provision_users
+
+CSV_HEADER = ["ID", "Sender", "Sender Dept", "Message", "Date", "Reported"]
+PURGE_CHUNK = 500
+PURGE_PAUSE = 0.01  # gives waiting writers a chance at the lock between chunks
+
+# ==========================================
+# Shared admin work (used inline and by background jobs)
+# ==========================================
+
+def compute_admin_stats(db: Session):
+    # Total Shoutouts count (posts of tombstoned users are hidden until the purge removes them)
+    total_shoutouts = (
+        db.query(ShoutOut)
+        .join(User, User.id == ShoutOut.sender_id)
+        .filter(User.is_deleted == False)
+        .count()
+    )
+
+    # Top Givers (Contributors)
+    top_givers = (
+        db.query(User.name, func.count(ShoutOut.id).label("count"))
+        .join(ShoutOut, User.id == ShoutOut.sender_id)
+        .filter(User.is_deleted == False)
+        .group_by(User.id, User.name)
+        .order_by(text("count DESC"))
+        .limit(5).all()
+    )
+
+    # Most Tagged (Recognized)
+    most_tagged = (
+        db.query(User.name, func.count(ShoutOutRecipient.id).label("count"))
+        .join(ShoutOutRecipient, User.id == ShoutOutRecipient.recipient_id)
+        .filter(User.is_deleted == False)
+        .group_by(User.id, User.name)
+        .order_by(text("count DESC"))
+        .limit(5).all()
+    )
+
+    # Departmental Engagement Stats
+    dept_stats = (
+        db.query(User.department, func.count(ShoutOut.id))
+        .join(ShoutOut, User.id == ShoutOut.sender_id)
+        .filter(User.is_deleted == False)
+        .group_by(User.department).all()
+    )
+
+    # Moderation Queue
+    reported_posts = (
+        db.query(ShoutOut)
+        .join(User, User.id == ShoutOut.sender_id)
+        .options(contains_eager(ShoutOut.sender))
+        .filter(ShoutOut.is_reported == True, User.is_deleted == False)
+        .all()
+    )
+
+    return {
+        "total_shoutouts": total_shoutouts,
+        "top_givers": [{"name": r[0], "count": r[1]} for r in top_givers],
+        "most_tagged": [{"name": r[0], "count": r[1]} for r in most_tagged],
+        "department_stats": {dept: count for dept, count in dept_stats},
+        "reported_posts": [{"id": p.id, "message": p.message, "sender": p.sender.name} for p in reported_posts]
+    }
+
+def shoutout_csv_rows(db: Session, on_progress=None):
+    # Yields CSV rows (header first), streaming shoutouts in batches
+    yield CSV_HEADER
+
+    total = db.query(ShoutOut).count() or 1
+    query = db.query(ShoutOut).options(joinedload(ShoutOut.sender)).order_by(ShoutOut.id)
+    for i, s in enumerate(query.yield_per(500), start=1):
+        # SAFETY CHECK: If sender was deleted, provide fallback text instead of crashing
+        sender_deleted = not s.sender or s.sender.is_deleted
+        sender_name = "Deleted User" if sender_deleted else s.sender.name
+        sender_dept = "N/A" if sender_deleted else s.sender.department
+
+        yield [
+            s.id,
+            sender_name,
+            sender_dept,
+            s.message,
+            s.created_at.strftime("%Y-%m-%d %H:%M") if s.created_at else "N/A",
+            "Yes" if s.is_reported else "No"
+        ]
+        if on_progress and i % 500 == 0:
+            on_progress(i * 100 // total)
+
+def soft_delete_user(db: Session, user: User, admin_id: int):
+    # Immediate part of a user deletion: tombstone the row, the purge job removes the data
+    user.is_deleted = True
+    user.deleted_at = func.now()
+    db.add(AdminLog(admin_id=admin_id, action=f"DELETED_USER: {user.email}", target_id=user.id, target_type="user"))
+    db.commit()
+    user_index.remove(user.id)
+
+def _delete_in_chunks(db: Session, model, condition):
+    # Set-based DELETE of at most PURGE_CHUNK rows per transaction, so the
+    # write lock is released between chunks instead of held for the whole purge
+    total = 0
+    while True:
+        ids = select(model.id).where(condition).limit(PURGE_CHUNK).scalar_subquery()
+        deleted = db.execute(delete(model).where(model.id.in_(ids)), execution_options={"synchronize_session": False}).rowcount
+        db.commit()
+        total += deleted
+        if deleted < PURGE_CHUNK:
+            return total
+        time.sleep(PURGE_PAUSE)
+
+def purge_user(db: Session, user_id: int, on_progress=None):
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or not user.is_deleted:
+        return {}
+
+    own_shoutouts = select(ShoutOut.id).where(ShoutOut.sender_id == user_id)
+    steps = [
+        # Children of the user's own shoutouts first, then the shoutouts themselves
+        ("comments_on_shoutouts", Comment, Comment.shoutout_id.in_(own_shoutouts)),
+        ("reactions_on_shoutouts", Reaction, Reaction.shoutout_id.in_(own_shoutouts)),
+        ("recipients_of_shoutouts", ShoutOutRecipient, ShoutOutRecipient.shoutout_id.in_(own_shoutouts)),
+        ("shoutouts", ShoutOut, ShoutOut.sender_id == user_id),
+        # Then the user's activity on other people's posts
+        ("comments", Comment, Comment.user_id == user_id),
+        ("reactions", Reaction, Reaction.user_id == user_id),
+        ("tagged", ShoutOutRecipient, ShoutOutRecipient.recipient_id == user_id),
+    ]
+
+    counts = {}
+    for i, (name, model, condition) in enumerate(steps):
+        counts[name] = _delete_in_chunks(db, model, condition)
+        if on_progress:
+            on_progress(int((i + 1) * 90 / len(steps)))
+
+    # Keep the audit trail and job history, just detach them from the user
+    db.execute(update(AdminLog).where(AdminLog.admin_id == user_id).values(admin_id=None))
+    db.execute(update(Job).where(Job.created_by == user_id).values(created_by=None))
+    db.execute(delete(User).where(User.id == user_id))
+    db.commit()
+    return counts
+
+# ==========================================
+# Job handlers
+# ==========================================
+
+@job_handler("export_csv")
+def export_csv_job(db: Session, params: dict, job):
+    path = artifact_path(job.id, "csv")
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for row in shoutout_csv_rows(db, on_progress=job.progress):
+            writer.writerow(row)
+            rows += 1
+    return {
+        "rows": rows - 1,
+        "artifact": path,
+        "filename": "bragboard_report.csv",
+        "media_type": "text/csv"
+    }
+
+@job_handler("admin_stats")
+def admin_stats_job(db: Session, params: dict, job):
+    stats = compute_admin_stats(db)
+    path = artifact_path(job.id, "json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, default=str)
+    return {
+        "total_shoutouts": stats["total_shoutouts"],
+        "artifact": path,
+        "filename": "bragboard_stats.json",
+        "media_type": "application/json"
+    }
+
+@job_handler("provision_users")
+def provision_users_job(db: Session, params: dict, job):
+    with open(params["upload"], encoding="utf-8") as f:
+        rows = parse_users(f.read(), params["format"])
+    result = provision_users(db, rows, admin_id=params.get("admin_id"), on_progress=job.progress)
+    if result["summary"]["created"]:
+        user_index.invalidate()
+
+    # Per-row report for download; the upload is only kept until the job succeeds
+    path = artifact_path(job.id, "json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    os.remove(params["upload"])
+    return {
+        "summary": result["summary"],
+        "artifact": path,
+        "filename": "bragboard_provisioning_report.json",
+        "media_type": "application/json"
+    }
+
+@job_handler("purge_user")
+def purge_user_job(db: Session, params: dict, job):
+    counts = purge_user(db, params["user_id"], on_progress=lambda p: job.progress(p, force=True))
+    return {"user_id": params["user_id"], "purged": bool(counts), "deleted_rows": counts}
@@ -1,16 +1,25 @@
 import csv
+import json
 import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
 from io import StringIO
 from typing import Optional, List
-from fastapi import FastAPI, Depends, HTTPException, status, Query, APIRouter
+from fastapi import FastAPI, Depends, HTTPException, status, Query, APIRouter, UploadFile, File, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func, text
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse, FileResponse, PlainTextResponse
+from sqlalchemy.orm import Session, configure_mappers
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
 
 # Local Imports
-from models import User, ShoutOut, Reaction, Comment, ShoutOutRecipient, AdminLog 
-from db import engine, Base, get_db
+from models import User, ShoutOut, Reaction, Comment, AdminLog, Job
+import db as database
+from db import SessionLocal, get_db, configure_engine, init_schema
 from schemas import (
     Register, 
     ShoutOutCreate, 
@@ -21,103 +30,61 @@ from schemas import (
 )
 from utils import hash_password
 from auth import get_current_user, login_user
-from shoutout_utils import create_shoutout, get_shoutouts
+from shoutout_utils import create_shoutout, get_shoutouts, get_comment_previews, get_comment_thread, get_reaction_counts
+from user_index import user_index
+from provisioning import parse_users, detect_format, provision_users, INLINE_MAX_ROWS
+from jobs import job_queue, job_to_dict, upload_path
+from admin_jobs import compute_admin_stats, shoutout_csv_rows, soft_delete_user
+from profiling import profiler, ProfilingMiddleware, ProfiledRoute
+from viewer_state import viewer_state
+from settings import Settings
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Database
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="BragBoard API 🚀")
-
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 # ==========================================
 # 1. ADMIN ROUTES (Milestone 4)
 # ==========================================
-admin_router = APIRouter(prefix="/admin", tags=["Admin"])
+admin_router = APIRouter(prefix="/admin", tags=["Admin"], route_class=ProfiledRoute)
+
+def _job_accepted(job):
+    return JSONResponse(status_code=202, content={"job_id": job.id, "status": job.status})
 
 @admin_router.get("/stats")
-def get_admin_stats(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_admin_stats(
+    background: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     # MILESTONE 4: Security check for admin access
     if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Not authorized as admin")
 
-    # Total Shoutouts count
-    total_shoutouts = db.query(ShoutOut).count()
-
-    # Top Givers (Contributors)
-    top_givers = (
-        db.query(User.name, func.count(ShoutOut.id).label("count"))
-        .join(ShoutOut, User.id == ShoutOut.sender_id)
-        .group_by(User.id, User.name)
-        .order_by(text("count DESC"))
-        .limit(5).all()
-    )
-
-    # Most Tagged (Recognized)
-    most_tagged = (
-        db.query(User.name, func.count(ShoutOutRecipient.id).label("count"))
-        .join(ShoutOutRecipient, User.id == ShoutOutRecipient.recipient_id)
-        .group_by(User.id, User.name)
-        .order_by(text("count DESC"))
-        .limit(5).all()
-    )
-
-    # Departmental Engagement Stats
-    dept_stats = (
-        db.query(User.department, func.count(ShoutOut.id))
-        .join(ShoutOut, User.id == ShoutOut.sender_id)
-        .group_by(User.department).all()
-    )
-
-    # Moderation Queue
-    reported_posts = db.query(ShoutOut).filter(ShoutOut.is_reported == True).all()
+    # ?background=true recomputes in the job queue and returns a job id
+    if background:
+        return _job_accepted(job_queue.enqueue(db, "admin_stats", created_by=current_user.id))
 
-    return {
-        "total_shoutouts": total_shoutouts,
-        "top_givers": [{"name": r[0], "count": r[1]} for r in top_givers],
-        "most_tagged": [{"name": r[0], "count": r[1]} for r in most_tagged],
-        "department_stats": {dept: count for dept, count in dept_stats},
-        "reported_posts": [{"id": p.id, "message": p.message, "sender": p.sender.name} for p in reported_posts]
-    }
+    return compute_admin_stats(db)
 
 @admin_router.get("/export-csv")
-def export_shoutouts_csv(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def export_shoutouts_csv(
+    background: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     # 1. Security Check
     if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
         raise HTTPException(status_code=403, detail="Unauthorized")
-    
-    # 2. Fetch all shoutouts
-    shoutouts = db.query(ShoutOut).all()
-    
+
+    # 2. Large exports: write the file in the job queue, download via /admin/jobs/{id}/download
+    if background:
+        return _job_accepted(job_queue.enqueue(db, "export_csv", created_by=current_user.id))
+
     # 3. Create CSV in memory
     output = StringIO()
     writer = csv.writer(output)
-    writer.writerow(["ID", "Sender", "Sender Dept", "Message", "Date", "Reported"])
-    
-    for s in shoutouts:
-        # SAFETY CHECK: If sender was deleted, provide fallback text instead of crashing
-        sender_name = s.sender.name if s.sender else "Deleted User"
-        sender_dept = s.sender.department if s.sender else "N/A"
-        
-        writer.writerow([
-            s.id, 
-            sender_name, 
-            sender_dept, 
-            s.message, 
-            s.created_at.strftime("%Y-%m-%d %H:%M") if s.created_at else "N/A", 
-            "Yes" if s.is_reported else "No"
-        ])
+    writer.writerows(shoutout_csv_rows(db))
     
     # 4. Prepare for Streaming
     response_content = output.getvalue()
@@ -129,6 +96,116 @@ def export_shoutouts_csv(db: Session = Depends(get_db), current_user: User = Dep
         headers={"Content-Disposition": "attachment; filename=bragboard_report.csv"}
     )
 
+@admin_router.get("/jobs")
+def list_jobs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    jobs = db.query(Job).order_by(Job.id.desc()).limit(50).all()
+    return [job_to_dict(j) for j in jobs]
+
+@admin_router.get("/jobs/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
+
+@admin_router.get("/jobs/{job_id}/download")
+def download_job_result(job_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+    result = json.loads(job.result or "{}")
+    if not result.get("artifact") or not os.path.exists(result["artifact"]):
+        raise HTTPException(status_code=404, detail="Job has no downloadable result")
+    return FileResponse(result["artifact"], media_type=result.get("media_type"), filename=result.get("filename"))
+
+@admin_router.get("/profiles")
+def list_profiles(current_user: User = Depends(get_current_user)):
+    if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    return profiler.status()
+
+@admin_router.get("/profiles/{capture_id}")
+def download_profile(
+    capture_id: int,
+    format: str = Query("json", pattern="^(json|folded)$"),
+    current_user: User = Depends(get_current_user)
+):
+    if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Unauthorized")
+
+    capture = profiler.get_capture(capture_id)
+    if not capture:
+        raise HTTPException(status_code=404, detail="Profile not found (the ring buffer may have rotated it out)")
+
+    # format=folded gives collapsed stacks for flamegraph.pl / speedscope
+    if format == "folded":
+        return PlainTextResponse(
+            capture["folded"],
+            headers={"Content-Disposition": f"attachment; filename=slow_request_{capture_id}.folded"}
+        )
+    return JSONResponse(capture, headers={"Content-Disposition": f"attachment; filename=slow_request_{capture_id}.json"})
+
+@admin_router.post("/profiler/start")
+def start_profiler(
+    seconds: float = Query(10, gt=0, le=300),
+    interval_ms: int = Query(5, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    try:
+        profiler.start_window(seconds, interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"message": f"Profiling for {seconds}s", "status": profiler.status()}
+
+@admin_router.post("/profiler/stop")
+def stop_profiler(current_user: User = Depends(get_current_user)):
+    if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    profiler.stop_window()
+    return profiler.status()
+
+@admin_router.get("/profiler/result")
+def profiler_result(current_user: User = Depends(get_current_user)):
+    if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    if profiler.status()["window_running"]:
+        raise HTTPException(status_code=409, detail="Profiling window still running")
+    if profiler.window_result is None:
+        raise HTTPException(status_code=404, detail="No profile recorded yet")
+    return PlainTextResponse(
+        profiler.window_result,
+        headers={"Content-Disposition": "attachment; filename=bragboard_profile.folded"}
+    )
+
+@admin_router.put("/profiler/slow-capture")
+def configure_slow_capture(
+    enabled: bool,
+    threshold_ms: int = Query(500, ge=1),
+    interval_ms: int = Query(5, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    if enabled:
+        profiler.enable_slow_capture(threshold_ms, interval_ms)
+    else:
+        profiler.disable_slow_capture()
+    return profiler.status()
+
 @admin_router.delete("/shoutout/{shoutout_id}")
 def delete_shoutout(shoutout_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     if not getattr(current_user, 'is_admin', False) and current_user.role != 'admin':
@@ -198,8 +275,46 @@ def admin_create_user(
     db.add(log)
     
     db.commit()
+    db.refresh(new_user)
+    user_index.add(new_user)
     return {"message": f"User {user_data.name} created successfully as {user_role}"}
 
+@admin_router.post("/users/bulk")
+def admin_bulk_create_users(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|jsonl)$"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # 1. Security Check
+    if not getattr(current_user, 'is_admin', False):
+        raise HTTPException(status_code=403, detail="Only admins can create users manually")
+
+    try:
+        content = file.file.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+
+    # 2. Parse, de-duplicate, hash and insert (see provisioning.py)
+    fmt = format or detect_format(file.filename, content)
+    rows = parse_users(content, fmt)
+
+    # Hashing takes ~0.25s per password, so anything but a small file goes to the
+    # job queue; the per-row report is downloaded from /admin/jobs/{id}/download
+    if len(rows) > INLINE_MAX_ROWS:
+        path = upload_path(fmt)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        params = {"upload": path, "format": fmt, "admin_id": current_user.id}
+        return _job_accepted(job_queue.enqueue(db, "provision_users", params, created_by=current_user.id))
+
+    result = provision_users(db, rows, admin_id=current_user.id)
+
+    # 3. Autocomplete index is rebuilt on next search
+    if result["summary"]["created"]:
+        user_index.invalidate()
+    return result
+
 @admin_router.delete("/users/{user_id}")
 def admin_delete_user(
     user_id: int, 
@@ -210,7 +325,7 @@ def admin_delete_user(
     if not getattr(current_user, 'is_admin', False):
         raise HTTPException(status_code=403, detail="Admin only.")
 
-    user_to_delete = db.query(User).filter(User.id == user_id).first()
+    user_to_delete = db.query(User).filter(User.id == user_id, User.is_deleted == False).first()
     
     if not user_to_delete:
         raise HTTPException(status_code=404, detail="User not found.")
@@ -219,23 +334,18 @@ def admin_delete_user(
     if user_to_delete.id == current_user.id:
         raise HTTPException(status_code=400, detail="You cannot delete your own admin account.")
 
-    # 2. Delete the user
-    db.delete(user_to_delete)
-    
-    # 3. Log the action
-    log = AdminLog(admin_id=current_user.id, action=f"DELETED_USER: {user_to_delete.email}")
-    db.add(log)
-    
-    db.commit()
-    return {"message": "User deleted successfully"}
-
-app.include_router(admin_router)
+    # 2. Soft delete now (hidden from feed and login), purge their content in the job queue
+    soft_delete_user(db, user_to_delete, current_user.id)
+    job = job_queue.enqueue(db, "purge_user", {"user_id": user_id}, created_by=current_user.id)
+    return {"message": "User deleted successfully", "purge_job_id": job.id}
 
 # ==========================================
 # 2. AUTHENTICATION
 # ==========================================
+router = APIRouter(route_class=ProfiledRoute)
+
 
-@app.post("/register", status_code=201)
+@router.post("/register", status_code=201)
 def register(user_data: Register, db: Session = Depends(get_db)):
     # 1. Check if user already exists
     existing_user = db.query(User).filter(User.email == user_data.email).first()
@@ -265,6 +375,7 @@ def register(user_data: Register, db: Session = Depends(get_db)):
         db.add(new_user)
         db.commit()
         db.refresh(new_user)
+        user_index.add(new_user)
         return {
             "message": "User created successfully", 
             "is_admin": new_user.is_admin
@@ -276,24 +387,55 @@ def register(user_data: Register, db: Session = Depends(get_db)):
             detail=f"Database error: {str(e)}"
         )
 
-@app.post("/login")
+@router.post("/login")
 def login(token=Depends(login_user)):
     return token
 
-@app.get("/me")
+@router.get("/me")
 def me(current_user: User = Depends(get_current_user)):
     return current_user
 
-@app.get("/users")
-def get_all_users(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    users = db.query(User).filter(User.id != current_user.id).all()
-    return [{"id": u.id, "name": u.name, "department": u.department} for u in users]
+@router.get("/users")
+def get_all_users(
+    cursor: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(User.id, User.name, User.department).filter(User.id != current_user.id, User.is_deleted == False)
+
+    # Without a limit keep the old behaviour (plain list of every user)
+    if limit is None:
+        return [{"id": u.id, "name": u.name, "department": u.department} for u in query.all()]
+
+    # Keyset pagination: cursor is the last user id of the previous page
+    if cursor is not None:
+        query = query.filter(User.id > cursor)
+    users = query.order_by(User.id).limit(limit + 1).all()
+
+    has_more = len(users) > limit
+    users = users[:limit]
+    return {
+        "items": [{"id": u.id, "name": u.name, "department": u.department} for u in users],
+        "next_cursor": users[-1].id if has_more else None
+    }
+
+@router.get("/users/search")
+def search_users(
+    prefix: str = "",
+    department: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    # Served from the in-memory prefix index (names, name parts and emails)
+    return user_index.search(db, prefix=prefix, department=department, limit=limit, exclude_id=current_user.id)
 
 # ==========================================
 # 3. SHOUTOUTS, REACTIONS, & COMMENTS
 # ==========================================
 
-@app.post("/shoutouts", status_code=201)
+@router.post("/shoutouts", status_code=201)
 def post_shoutout(
     shoutout: ShoutOutCreate, 
     db: Session = Depends(get_db), 
@@ -306,81 +448,152 @@ def post_shoutout(
     # 2. Now create the shoutout
     return create_shoutout(db, shoutout.message, current_user.id, shoutout.recipient_ids or [])
 
-@app.get("/shoutouts")
+# Sparse fieldsets for the feed: ?fields= picks top-level fields, ?include= picks relations
+FEED_FIELDS = ("message", "sender", "sender_department", "created_at", "is_reported")
+FEED_RELATIONS = ("recipients", "comments", "reactions", "viewer")
+REACTION_TYPES = ("like", "clap", "star")
+
+def _parse_field_list(value: Optional[str], allowed: tuple, param: str):
+    if value is None:
+        return set(allowed)
+    requested = {f.strip() for f in value.split(",") if f.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown {param}: {', '.join(sorted(unknown))}")
+    return requested
+
+@router.get("/shoutouts")
 def get_shoutouts_endpoint(
     depts: Optional[List[str]] = Query(None), 
+    comments_limit: int = Query(3, ge=0, le=20),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. message,sender"),
+    include: Optional[str] = Query(None, description="Comma-separated relations: recipients,comments,reactions (empty for none)"),
     db: Session = Depends(get_db), 
     current_user: User = Depends(get_current_user)
 ):
-    # Fetch shoutouts from your utility function
-    shoutouts_list = get_shoutouts(db, department=depts) 
+    wanted_fields = _parse_field_list(fields, FEED_FIELDS, "fields")
+    wanted_relations = _parse_field_list(include, FEED_RELATIONS, "include")
+
+    # Fetch shoutouts from your utility function (relations that are not requested are never queried)
+    shoutouts_list = get_shoutouts(db, department=depts, with_recipients="recipients" in wanted_relations)
+    shoutout_ids = [s.id for s in shoutouts_list]
+
+    # Only the latest few comments per post; the full thread is paginated separately
+    if "comments" in wanted_relations:
+        comment_previews, comment_counts = get_comment_previews(db, shoutout_ids, comments_limit)
+    if "reactions" in wanted_relations:
+        reaction_totals = get_reaction_counts(db, shoutout_ids)
+    # What the current user has done on each post (batched per page, cached per user)
+    if "viewer" in wanted_relations:
+        my_state = viewer_state.get_many(db, current_user.id, shoutout_ids)
 
     result = []
     for s in shoutouts_list:
         # SKIP shoutouts where the sender no longer exists (prevents frontend crash)
-        if not s.sender:
+        if not s.sender or s.sender.is_deleted:
             continue
 
+        item = {"id": s.id}
+        if "message" in wanted_fields:
+            item["message"] = s.message
+        if "sender" in wanted_fields:
+            item["sender"] = s.sender.name
+        if "sender_department" in wanted_fields:
+            item["sender_department"] = s.sender.department
+
         # Safe recipient extraction
-        recipients = []
-        for r in s.recipients:
-            if r.recipient: # Safety check
-                recipients.append({"id": r.recipient.id, "name": r.recipient.name})
-        
-        # Safe comments extraction
-        comments_list = []
-        for c in s.comments:
-            comments_list.append({
-                "id": c.id,
-                "text": c.text,
-                # If the user who commented was deleted, show "Unknown User"
-                "user": {"id": c.user.id, "name": c.user.name} if c.user else {"name": "Deleted User"}
-            })
+        if "recipients" in wanted_relations:
+            item["recipients"] = [
+                {"id": r.recipient.id, "name": r.recipient.name}
+                for r in s.recipients
+                if r.recipient and not r.recipient.is_deleted # Safety check
+            ]
+
+        if "comments" in wanted_relations:
+            item["comments"] = comment_previews.get(s.id, [])
+            item["comment_count"] = comment_counts.get(s.id, 0)
 
         # Reaction counts
-        reaction_counts = {"like": 0, "clap": 0, "star": 0}
-        for r in s.reactions:
-            if r.reaction_type in reaction_counts:
-                reaction_counts[r.reaction_type] += 1
-
-        # Build the final object
-        result.append({
-            "id": s.id,
-            "message": s.message,
-            "sender": s.sender.name,
-            "sender_department": s.sender.department,
-            "recipients": recipients,
-            "comments": comments_list,
-            "reactions": reaction_counts,
-            "created_at": s.created_at,
-            "is_reported": getattr(s, 'is_reported', False)
-        })
+        if "reactions" in wanted_relations:
+            counts = reaction_totals.get(s.id, {})
+            item["reactions"] = {t: counts.get(t, 0) for t in REACTION_TYPES}
+
+        if "viewer" in wanted_relations:
+            item["my_reactions"] = my_state[s.id]["my_reactions"]
+            item["my_commented"] = my_state[s.id]["commented"]
+
+        if "created_at" in wanted_fields:
+            item["created_at"] = s.created_at
+        if "is_reported" in wanted_fields:
+            item["is_reported"] = getattr(s, 'is_reported', False)
+
+        result.append(item)
         
     return result
 
-@app.post("/shoutouts/{shoutout_id}/reactions")
+@router.get("/shoutouts/{shoutout_id}/comments")
+def get_shoutout_comments(
+    shoutout_id: int,
+    cursor: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if not db.query(ShoutOut.id).filter(ShoutOut.id == shoutout_id).first():
+        raise HTTPException(status_code=404, detail="Post not found")
+    return get_comment_thread(db, shoutout_id, cursor=cursor, limit=limit)
+
+@router.post("/shoutouts/{shoutout_id}/reactions")
 def toggle_reaction(shoutout_id: int, reaction: ReactionCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    existing = db.query(Reaction).filter(
-        Reaction.shoutout_id == shoutout_id, 
-        Reaction.user_id == current_user.id, 
-        Reaction.reaction_type == reaction.reaction_type
-    ).first()
-
-    if existing:
-        db.delete(existing)
-        db.commit()
-        return {"action": "removed"}
+    user_id, reaction_type = current_user.id, reaction.reaction_type
+
+    # No SELECT before the write: the DELETE's rowcount says whether the reaction
+    # existed (the viewer cache may be stale, so it never decides what to write)
+    removed = db.execute(
+        delete(Reaction).where(
+            Reaction.shoutout_id == shoutout_id,
+            Reaction.user_id == user_id,
+            Reaction.reaction_type == reaction_type
+        )
+    ).rowcount > 0
+    if not removed:
+        db.add(Reaction(reaction_type=reaction_type, user_id=user_id, shoutout_id=shoutout_id))
 
-    new_rec = Reaction(reaction_type=reaction.reaction_type, user_id=current_user.id, shoutout_id=shoutout_id)
-    db.add(new_rec)
-    db.commit()
-    return {"action": "added"}
+    try:
+        db.commit()
+    except IntegrityError:
+        # Either the post is gone (foreign key) or a concurrent toggle added the
+        # same reaction first (unique index), in which case it is there now
+        db.rollback()
+        if not db.query(ShoutOut.id).filter(ShoutOut.id == shoutout_id).first():
+            raise HTTPException(status_code=404, detail="Post not found")
+    viewer_state.set_reaction(user_id, shoutout_id, reaction_type, present=not removed)
+
+    # Return the new state so the client does not need to refetch the feed
+    my_reactions = viewer_state.my_reactions(user_id, shoutout_id)
+    if my_reactions is None:
+        my_reactions = sorted(
+            t for (t,) in db.query(Reaction.reaction_type)
+            .filter(Reaction.user_id == user_id, Reaction.shoutout_id == shoutout_id)
+            .distinct()
+        )
+    counts = get_reaction_counts(db, [shoutout_id]).get(shoutout_id, {})
+    return {
+        "action": "removed" if removed else "added",
+        "reaction_type": reaction_type,
+        "my_reactions": my_reactions,
+        "reactions": {t: counts.get(t, 0) for t in REACTION_TYPES}
+    }
 
-@app.post("/shoutouts/{shoutout_id}/comments")
+@router.post("/shoutouts/{shoutout_id}/comments")
 def add_comment(shoutout_id: int, comment_data: CommentCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if not db.query(ShoutOut.id).filter(ShoutOut.id == shoutout_id).first():
+        raise HTTPException(status_code=404, detail="Post not found")
+
     new_comment = Comment(text=comment_data.text, user_id=current_user.id, shoutout_id=shoutout_id)
     db.add(new_comment)
     db.commit()
+    viewer_state.mark_commented(current_user.id, shoutout_id)
     # Return the comment with user info so the frontend can display it immediately
     return {
         "id": new_comment.id,
@@ -388,7 +601,7 @@ def add_comment(shoutout_id: int, comment_data: CommentCreate, db: Session = Dep
         "user": {"id": current_user.id, "name": current_user.name}
     }
 
-@app.put("/shoutouts/{shoutout_id}/report")
+@router.put("/shoutouts/{shoutout_id}/report")
 def report_shoutout(shoutout_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
     # MILESTONE 4: Reporting content
     s = db.query(ShoutOut).filter(ShoutOut.id == shoutout_id).first()
@@ -398,7 +611,144 @@ def report_shoutout(shoutout_id: int, db: Session = Depends(get_db), current_use
     db.commit()
     return {"message": "Reported"}
 
-@app.get("/")
+@router.get("/")
 def home():
     return {"message": "BragBoard API is running!"}
 
+# ==========================================
+# 4. HEALTH
+# ==========================================
+
+@router.get("/health/live")
+def liveness():
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+def readiness(request: Request):
+    # Ready only once schema checks and warmup in the lifespan hook have finished
+    state = request.app.state
+    if not getattr(state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready", "startup_ms": state.startup_timings}
+
+# ==========================================
+# 5. APP FACTORY & STARTUP
+# ==========================================
+
+_schema_checked = set()
+_schema_lock = threading.Lock()
+
+def init_database(settings: Settings):
+    # Schema checks only run once per process and database, however many apps are created
+    with _schema_lock:
+        if settings.database_url in _schema_checked:
+            return
+        init_schema()
+        _schema_checked.add(settings.database_url)
+
+def warm_up(settings: Settings):
+    timings = {}
+
+    # 1. Mapper configuration is otherwise paid by the first request
+    start = time.perf_counter()
+    configure_mappers()
+    timings["mappers"] = round((time.perf_counter() - start) * 1000, 1)
+
+    # 2. Open the pool's connections up front (runs the SQLite pragmas once per connection)
+    start = time.perf_counter()
+    pool_size = getattr(database.engine.pool, "size", lambda: 1)()
+    connections = [database.engine.connect() for _ in range(max(1, pool_size))]
+    for conn in connections:
+        conn.exec_driver_sql("SELECT 1")
+    for conn in connections:
+        conn.close()
+    timings["pool"] = round((time.perf_counter() - start) * 1000, 1)
+
+    # 3. Run the hot query shapes once, so their compiled SQL is in the statement
+    #    cache before real traffic arrives. Lookups use values that match nothing;
+    #    the feed runs exactly as the default GET /shoutouts does, since any filter
+    #    would make it a different statement (and cache key)
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.id == 0, User.is_deleted == False).first()
+        db.query(User).filter(User.email == "", User.is_deleted == False).first()
+        get_shoutouts(db, department=None, with_recipients=True)
+        get_comment_previews(db, [0], 3)
+        get_reaction_counts(db, [0])
+        get_comment_thread(db, 0, limit=1)
+        viewer_state.get_many(db, 0, [0])
+        viewer_state.invalidate(0)
+        timings["statement_cache"] = round((time.perf_counter() - start) * 1000, 1)
+
+        # 4. In-memory indexes
+        start = time.perf_counter()
+        user_index.ensure_loaded(db)
+        timings["user_index"] = round((time.perf_counter() - start) * 1000, 1)
+    finally:
+        db.close()
+    return timings
+
+def startup(settings: Settings):
+    timings = {}
+    start = time.perf_counter()
+    if settings.schema_check:
+        init_database(settings)
+        timings["schema_check"] = round((time.perf_counter() - start) * 1000, 1)
+    if settings.warmup:
+        timings["warmup"] = warm_up(settings)
+
+    # Resume jobs left queued by a previous run (Settings.job_workers is the only worker count)
+    job_queue.workers = settings.job_workers
+    job_queue.start()
+    timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+    return timings
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.ready = False
+    app.state.startup_timings = await run_in_threadpool(startup, app.state.settings)
+    app.state.ready = True
+    logger.info("BragBoard ready in %s ms", app.state.startup_timings["total"])
+    yield
+    app.state.ready = False
+    job_queue.stop()
+
+def create_app(settings: Settings = None) -> FastAPI:
+    settings = settings or Settings()
+
+    # There is one engine per process, so a different database repoints every app
+    # and the job queue; stop the workers and reset the caches built from the old one
+    if settings.database_url != database.SQLALCHEMY_DATABASE_URL:
+        logger.info("Switching database to %s", settings.database_url)
+        job_queue.stop()
+        configure_engine(settings.database_url)
+        user_index.invalidate()
+        viewer_state.invalidate()
+
+    app = FastAPI(title="BragBoard API 🚀", lifespan=lifespan)
+    app.state.settings = settings
+    app.state.ready = False
+
+    # CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Compress responses for clients that send Accept-Encoding: gzip.
+    # Small bodies are sent as-is since compressing them costs more than it saves.
+    app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")), compresslevel=6)
+
+    # Slow-request capture (off unless enabled via PROFILE_SLOW_MS or /admin/profiler/slow-capture)
+    app.add_middleware(ProfilingMiddleware)
+
+    app.include_router(admin_router)
+    app.include_router(router)
+    return app
+
+# `uvicorn app:app` entry point; no database work happens until the lifespan hook runs
+app = create_app()
@@ -29,7 +29,7 @@ def login_user(
     db: Session = Depends(get_db),
 ):
     # Search by email (Swagger uses the 'username' field)
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = db.query(User).filter(User.email == form_data.username, User.is_deleted == False).first()
 
     if not user:
         raise HTTPException(
@@ -73,7 +73,8 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    # Soft-deleted users lose access immediately, before their data is purged
+    user = db.query(User).filter(User.id == int(user_id), User.is_deleted == False).first()
     if not user:
         raise credentials_exception
 
@@ -0,0 +1,116 @@
+"""Feed payload benchmark: response size and encode time with and without
+compression and sparse fieldsets.
+
+Runs against a throwaway SQLite database in a temp directory:
+
+    python bench_feed.py [--posts 500] [--runs 20]
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def seed(db, posts: int):
+    from models import User, ShoutOut, ShoutOutRecipient, Reaction, Comment
+
+    random.seed(7)
+    depts = ["Engineering", "Sales", "Marketing", "Finance", "People Ops"]
+    users = [
+        User(name=f"Employee {i}", email=f"employee{i}@example.com", password="x", department=random.choice(depts))
+        for i in range(200)
+    ]
+    db.add_all(users)
+    db.flush()
+    ids = [u.id for u in users]
+
+    for p in range(posts):
+        s = ShoutOut(message=f"Huge thanks for shipping release {p}! " * 3, sender_id=random.choice(ids))
+        db.add(s)
+        db.flush()
+        for rid in random.sample(ids, 3):
+            db.add(ShoutOutRecipient(shoutout_id=s.id, recipient_id=rid))
+        for uid in random.sample(ids, 10):
+            db.add(Comment(text="Well deserved, great work!", user_id=uid, shoutout_id=s.id))
+        for uid in random.sample(ids, 20):
+            db.add(Reaction(reaction_type=random.choice(["like", "clap", "star"]), user_id=uid, shoutout_id=s.id))
+    db.commit()
+    return ids[0]
+
+
+def measure(client, url, headers, runs):
+    times, body = [], b""
+    for _ in range(runs):
+        start = time.perf_counter()
+        r = client.get(url, headers=headers)
+        times.append((time.perf_counter() - start) * 1000)
+        body = r.content  # decoded body; the wire size comes from Content-Length below
+    raw = client.get(url, headers=headers)
+    wire = int(raw.headers.get("content-length") or len(raw.content))
+    return statistics.median(times), wire, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+
+    from fastapi.testclient import TestClient
+    from db import SessionLocal
+    from app import create_app
+    from settings import Settings
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bragboard-bench-"), "bench.db")
+    app = create_app(Settings(database_url=f"sqlite:///{db_path}", job_workers=0))
+
+    with TestClient(app) as client:
+        db = SessionLocal()
+        viewer_id = seed(db, args.posts)
+        db.close()
+        run_cases(client, viewer_id, args)
+
+
+def run_cases(client, viewer_id, args):
+    from auth import create_access_token
+
+    auth = {"Authorization": f"Bearer {create_access_token(viewer_id)}"}
+    cases = [
+        ("full feed, identity", "/shoutouts", {**auth, "Accept-Encoding": "identity"}),
+        ("full feed, gzip", "/shoutouts", {**auth, "Accept-Encoding": "gzip"}),
+        ("cards only, identity", "/shoutouts?include=", {**auth, "Accept-Encoding": "identity"}),
+        ("cards only, gzip", "/shoutouts?include=", {**auth, "Accept-Encoding": "gzip"}),
+    ]
+
+    print(f"{args.posts} posts, median of {args.runs} runs\n")
+    print(f"{'case':<24}{'bytes on wire':>15}{'request ms':>12}")
+    bodies = {}
+    for name, url, headers in cases:
+        ms, wire, body = measure(client, url, headers, args.runs)
+        bodies[url] = body
+        print(f"{name:<24}{wire:>15,}{ms:>12.1f}")
+
+    # Encode cost on its own: JSON serialisation and gzip of the same payload
+    print(f"\n{'payload':<24}{'json ms':>10}{'gzip ms':>10}{'ratio':>8}")
+    for url, label in (("/shoutouts", "full feed"), ("/shoutouts?include=", "cards only")):
+        data = json.loads(bodies[url])
+        start = time.perf_counter()
+        encoded = json.dumps(data).encode()
+        json_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        compressed = gzip.compress(encoded, compresslevel=6)
+        gzip_ms = (time.perf_counter() - start) * 1000
+        print(f"{label:<24}{json_ms:>10.2f}{gzip_ms:>10.2f}{len(encoded) / len(compressed):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
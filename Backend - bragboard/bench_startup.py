@@ -0,0 +1,92 @@
+"""Cold-start benchmark: time from `import app` to the first feed response.
+
+Each case runs in a fresh interpreter against a throwaway SQLite database:
+
+    python bench_startup.py [--posts 200] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in the child process; prints one JSON line of timings in ms
+CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {backend!r})
+import app as app_module
+t_import = time.perf_counter()
+
+from fastapi.testclient import TestClient
+from auth import create_access_token
+from settings import Settings
+
+app = app_module.create_app(Settings(database_url={url!r}, schema_check={schema_check}, warmup={warmup}, job_workers=0))
+with TestClient(app) as client:
+    t_startup = time.perf_counter()
+    assert client.get("/health/ready").status_code == 200
+    t_ready = time.perf_counter()
+    r = client.get("/shoutouts", headers={{"Authorization": "Bearer " + create_access_token(1)}})
+    assert r.status_code == 200, r.text
+    t_first = time.perf_counter()
+
+ms = lambda a, b: round((b - a) * 1000, 1)
+print(json.dumps({{
+    "import": ms(t0, t_import),
+    "startup": ms(t_import, t_startup),
+    "ready": ms(t0, t_ready),
+    "first_feed": ms(t_ready, t_first),
+    "total": ms(t0, t_first),
+}}))
+"""
+
+CASES = [
+    ("schema check + warmup", True, True),
+    ("schema check, no warmup", True, False),
+    ("skip schema check + warmup", False, True),
+    ("skip schema check, no warmup", False, False),
+]
+
+
+def run_child(url, schema_check, warmup):
+    code = CHILD.format(backend=BACKEND_DIR, url=url, schema_check=schema_check, warmup=warmup)
+    env = {**os.environ, "DATABASE_URL": url}
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Build and seed the database once, with the schema in place
+    sys.path.insert(0, BACKEND_DIR)
+    from fastapi.testclient import TestClient
+    from app import create_app
+    from bench_feed import seed
+    from db import SessionLocal
+    from settings import Settings
+
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bragboard-startup-'), 'startup.db')}"
+    with TestClient(create_app(Settings(database_url=url, warmup=False, job_workers=0))):
+        db = SessionLocal()
+        seed(db, args.posts)
+        db.close()
+
+    print(f"{args.posts} posts, median of {args.repeat} fresh processes (ms)\n")
+    print(f"{'case':<30}{'import':>8}{'startup':>9}{'ready':>8}{'1st feed':>10}{'total':>8}")
+    for name, schema_check, warmup in CASES:
+        runs = [run_child(url, schema_check, warmup) for _ in range(args.repeat)]
+        med = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+        print(f"{name:<30}{med['import']:>8.1f}{med['startup']:>9.1f}{med['ready']:>8.1f}{med['first_feed']:>10.1f}{med['total']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
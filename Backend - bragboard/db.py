@@ -1,13 +1,31 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event, inspect, select, delete, func, and_
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.schema import CreateTable
 
-# SQLite database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./bragboard.db"
+# SQLite database (override with DATABASE_URL or create_app(Settings(database_url=...)))
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./bragboard.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # SQLite only
-)
+# WAL lets the feed keep reading while background jobs write
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    # Needed for ON DELETE CASCADE / SET NULL to take effect
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+def _make_engine(url: str):
+    if not url.startswith("sqlite"):
+        return create_engine(url)
+    new_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False}  # SQLite only
+    )
+    event.listen(new_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+engine = _make_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -17,6 +35,17 @@ SessionLocal = sessionmaker(
 
 Base = declarative_base()
 
+# Point the app (and every SessionLocal user) at another database, e.g. a temp DB in tests
+def configure_engine(url: str):
+    global engine, SQLALCHEMY_DATABASE_URL
+    if url == SQLALCHEMY_DATABASE_URL:
+        return engine
+    engine.dispose()
+    engine = _make_engine(url)
+    SQLALCHEMY_DATABASE_URL = url
+    SessionLocal.configure(bind=engine)
+    return engine
+
 # ✅ THIS WAS MISSING
 def get_db():
     db = SessionLocal()
@@ -24,3 +53,102 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Full schema check used by the app at startup and by the CLIs
+def init_schema():
+    import models  # noqa: F401  registers every table on Base.metadata
+    Base.metadata.create_all(bind=engine)
+    ensure_columns()
+    ensure_foreign_keys()
+    ensure_indexes()
+
+# create_all only creates missing tables, so add columns declared later on existing ones
+def ensure_columns():
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" NOT NULL DEFAULT {column.server_default.arg}" if not column.nullable else f" DEFAULT {column.server_default.arg}"
+                conn.exec_driver_sql(ddl)
+
+# SQLite cannot alter a constraint, so tables whose foreign keys were created
+# without the declared ON DELETE action (databases from before it existed) are
+# rebuilt. Run after ensure_columns and before ensure_indexes (the rebuild drops indexes).
+def ensure_foreign_keys():
+    if engine.dialect.name != "sqlite":
+        return
+    inspector = inspect(engine)
+    stale = [t for t in Base.metadata.sorted_tables if _declared_fks(t) != _existing_fks(inspector, t.name)]
+    if not stale:
+        return
+
+    raw = engine.raw_connection()
+    conn = raw.driver_connection
+    isolation_level = conn.isolation_level
+    try:
+        conn.isolation_level = None  # PRAGMA foreign_keys has no effect inside a transaction
+        conn.execute("PRAGMA foreign_keys=OFF")
+        conn.execute("BEGIN")
+        try:
+            for table in stale:
+                name = table.name
+                columns = ", ".join(c["name"] for c in inspector.get_columns(name) if c["name"] in table.c)
+                ddl = str(CreateTable(table).compile(dialect=engine.dialect))
+                conn.execute(ddl.replace(f"CREATE TABLE {name} ", f"CREATE TABLE _new_{name} ", 1))
+                conn.execute(f"INSERT INTO _new_{name} ({columns}) SELECT {columns} FROM {name}")
+                conn.execute(f"DROP TABLE {name}")
+                conn.execute(f"ALTER TABLE _new_{name} RENAME TO {name}")
+
+            # The old schema never enforced its foreign keys; apply the ON DELETE
+            # action to rows left pointing at deleted parents (parents first)
+            for table in Base.metadata.sorted_tables:
+                for fk in table.foreign_keys:
+                    child, parent = fk.parent.name, fk.column
+                    orphaned = f"{child} IS NOT NULL AND {child} NOT IN (SELECT {parent.name} FROM {parent.table.name})"
+                    if (fk.ondelete or "").upper() == "CASCADE":
+                        conn.execute(f"DELETE FROM {table.name} WHERE {orphaned}")
+                    elif (fk.ondelete or "").upper() == "SET NULL":
+                        conn.execute(f"UPDATE {table.name} SET {child} = NULL WHERE {orphaned}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.execute("PRAGMA foreign_keys=ON")
+    finally:
+        conn.isolation_level = isolation_level
+        raw.close()
+
+def _declared_fks(table):
+    return {(fk.parent.name, fk.column.table.name, (fk.ondelete or "NO ACTION").upper()) for fk in table.foreign_keys}
+
+def _existing_fks(inspector, table_name):
+    return {
+        (col, fk["referred_table"], (fk.get("options", {}).get("ondelete") or "NO ACTION").upper())
+        for fk in inspector.get_foreign_keys(table_name)
+        for col in fk["constrained_columns"]
+    }
+
+# Same for indexes; duplicates left from before a unique index existed are
+# dropped first (keeping the oldest row) so the index can be created
+def ensure_indexes():
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            if index.unique:
+                _drop_duplicates(table, list(index.columns))
+            index.create(bind=engine)
+
+def _drop_duplicates(table, columns):
+    not_null = and_(*(c.isnot(None) for c in columns))
+    keep = select(func.min(table.c.id)).where(not_null).group_by(*columns)
+    with engine.begin() as conn:
+        conn.execute(delete(table).where(not_null, table.c.id.not_in(keep)))
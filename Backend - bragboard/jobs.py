@@ -0,0 +1,278 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update, and_, or_
+
+from db import SessionLocal
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+# Job artifacts (CSV exports, stats snapshots) are written here
+ARTIFACT_DIR = os.getenv("JOB_ARTIFACT_DIR", "./job_artifacts")
+POLL_INTERVAL = 1.0
+LEASE_SECONDS = 60          # a running job whose lease expired is reclaimed by any worker
+HEARTBEAT_INTERVAL = LEASE_SECONDS / 3
+RETRY_BACKOFF = 2.0         # seconds before the first retry, doubled for each one after
+
+_handlers = {}
+
+
+def job_handler(kind: str):
+    # Register a function(db, params, job) as the handler for a job kind
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def artifact_path(job_id: int, ext: str):
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    return os.path.join(ARTIFACT_DIR, f"job_{job_id}.{ext}")
+
+
+def upload_path(ext: str):
+    # Where an upload waits for the job that processes it
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    return os.path.join(ARTIFACT_DIR, f"upload_{uuid.uuid4().hex}.{ext}")
+
+
+def _utcnow():
+    # Naive UTC, like the func.now() defaults SQLite stores
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+def _claimable(now):
+    # Queued and past its backoff, or running under a lease nobody renewed (worker died)
+    return or_(
+        and_(Job.status == "queued", or_(Job.run_after.is_(None), Job.run_after <= now)),
+        and_(Job.status == "running", or_(Job.lease_until.is_(None), Job.lease_until < now)),
+    )
+
+
+def job_to_dict(job: Job):
+    result = json.loads(job.result) if job.result else None
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "attempts": job.attempts,
+        "error": job.error,
+        "run_after": job.run_after,
+        "result": {k: v for k, v in result.items() if k != "artifact"} if result else None,
+        "has_artifact": bool(result and result.get("artifact")),
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+class JobContext:
+    # Handed to handlers so they can report progress without touching the job row directly
+    def __init__(self, job_id: int):
+        self.id = job_id
+        self._last = 0.0
+
+    def progress(self, percent: int, force: bool = False):
+        # Throttled: one short write transaction at most every half second
+        now = time.monotonic()
+        if not force and now - self._last < 0.5:
+            return
+        self._last = now
+        db = SessionLocal()
+        try:
+            db.execute(update(Job).where(Job.id == self.id).values(progress=max(0, min(100, int(percent)))))
+            db.commit()
+        finally:
+            db.close()
+
+
+class JobQueue:
+    # workers comes from Settings.job_workers at app startup; with 0 workers
+    # enqueue() runs the job inline on the caller's thread
+    def __init__(self, workers: int = 0):
+        self.workers = workers
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            if self.workers <= 0:
+                logger.warning("No job workers configured; background jobs will run inline")
+                return
+            # Jobs of a crashed process are picked up once their lease expires (see _claimable)
+            self._stop.clear()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def enqueue(self, db, kind: str, params: dict = None, created_by: int = None, max_retries: int = 3):
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = Job(kind=kind, params=json.dumps(params or {}), created_by=created_by, max_retries=max_retries)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        if self.workers <= 0:
+            self._run_inline(job.id)
+            db.refresh(job)
+            return job
+
+        self.start()
+        self._wake.set()
+        return job
+
+    def _run_inline(self, job_id: int):
+        # Same claim/execute/retry cycle as a worker, for this one job (waiting out its backoff)
+        db = SessionLocal()
+        try:
+            while True:
+                job = self._claim_job(db, job_id)
+                if job:
+                    self._execute(db, job)
+                    continue
+                job = db.query(Job).filter(Job.id == job_id).first()
+                if not job or job.status != "queued" or job.run_after is None:
+                    return
+                time.sleep(max(0.0, (job.run_after - _utcnow()).total_seconds()))
+        finally:
+            db.close()
+
+    def _claim_job(self, db, job_id: int):
+        # The claimable check in the UPDATE itself makes the claim safe across workers and processes
+        now = _utcnow()
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, _claimable(now))
+            .values(
+                status="running",
+                attempts=Job.attempts + 1,
+                worker=_worker_id(),
+                lease_until=now + timedelta(seconds=LEASE_SECONDS),
+                run_after=None,
+            )
+        )
+        db.commit()
+        if claimed.rowcount != 1:
+            return None
+        job = db.query(Job).filter(Job.id == job_id).first()
+        # A job whose worker keeps dying mid-run must not be retried forever
+        if job.attempts > job.max_retries:
+            job.status = "failed"
+            job.error = job.error or "Worker stopped while running the job"
+            db.commit()
+            return None
+        return job
+
+    def _claim(self, db):
+        # Claim the oldest claimable job
+        while True:
+            candidate = db.query(Job.id).filter(_claimable(_utcnow())).order_by(Job.id).first()
+            if not candidate:
+                return None
+            job = self._claim_job(db, candidate.id)
+            if job:
+                return job
+
+    def _heartbeat(self, job_id: int, worker: str, done: threading.Event):
+        # Keeps the lease alive while the handler runs, so other processes leave the job alone
+        while not done.wait(HEARTBEAT_INTERVAL):
+            db = SessionLocal()
+            try:
+                db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.worker == worker, Job.status == "running")
+                    .values(lease_until=_utcnow() + timedelta(seconds=LEASE_SECONDS))
+                )
+                db.commit()
+            except Exception:
+                logger.exception("Heartbeat for job %s failed", job_id)
+            finally:
+                db.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                job = self._claim(db)
+                if job:
+                    self._execute(db, job)
+            except Exception:
+                logger.exception("Job worker error")
+                job = None
+            finally:
+                db.close()
+
+            if not job:
+                self._wake.wait(POLL_INTERVAL)
+                self._wake.clear()
+
+    def _execute(self, db, job: Job):
+        job_id, kind, worker = job.id, job.kind, job.worker
+        handler = _handlers.get(kind)
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, worker, done), daemon=True)
+        heartbeat.start()
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job kind: {kind}")
+            result = handler(db, json.loads(job.params or "{}"), JobContext(job_id))
+            db.rollback()  # drop anything the handler left open before writing status
+            job = self._owned(db, job_id, worker)
+            if job:
+                job.status = "done"
+                job.progress = 100
+                job.result = json.dumps(result or {}, default=str)
+                job.error = None
+                job.lease_until = None
+                db.commit()
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job_id, kind)
+            db.rollback()
+            job = self._owned(db, job_id, worker)
+            if job:
+                job.error = str(e)
+                job.lease_until = None
+                if job.attempts < job.max_retries:
+                    # Back off so transient errors (e.g. "database is locked") can clear
+                    job.status = "queued"
+                    job.run_after = _utcnow() + timedelta(seconds=RETRY_BACKOFF * 2 ** (job.attempts - 1))
+                else:
+                    job.status = "failed"
+                db.commit()
+        finally:
+            done.set()
+            heartbeat.join()
+
+    def _owned(self, db, job_id: int, worker: str):
+        # None if the lease was lost and another worker has reclaimed the job meanwhile
+        job = db.query(Job).filter(Job.id == job_id).first()
+        if job and (job.worker != worker or job.status != "running"):
+            logger.warning("Job %s was reclaimed by %s; not recording this run", job_id, job.worker)
+            return None
+        return job
+
+
+job_queue = JobQueue()
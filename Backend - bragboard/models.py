@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from db import Base
@@ -12,49 +12,58 @@ class User(Base):
     department = Column(String, nullable=False)
     role = Column(String, default="employee")
     is_admin = Column(Boolean, default=False)
+    # Soft delete: the row stays until the background purge removes it and its content
+    is_deleted = Column(Boolean, default=False, server_default="0", nullable=False, index=True)
+    deleted_at = Column(DateTime)
     
     # Updated: Added cascade to prevent "Failed to load shout-outs" error
+    # passive_deletes: the ON DELETE CASCADE foreign keys remove child rows, so
+    # deleting a user does not load them into the session first
     sent_shoutouts = relationship(
         "ShoutOut", 
         back_populates="sender", 
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     received_shoutouts = relationship(
         "ShoutOutRecipient", 
         back_populates="recipient", 
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     reactions = relationship(
         "Reaction", 
         back_populates="user", 
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     comments = relationship(
         "Comment", 
         back_populates="user", 
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
 class ShoutOut(Base):
     __tablename__ = "shoutouts"
     id = Column(Integer, primary_key=True, index=True)
     message = Column(Text, nullable=False)
-    sender_id = Column(Integer, ForeignKey("users.id"))
+    sender_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     created_at = Column(DateTime, default=func.now())
     is_reported = Column(Boolean, default=False)
 
     sender = relationship("User", back_populates="sent_shoutouts")
     
     # Updated: Ensure recipients, reactions, and comments are cleared when shoutout is deleted
-    recipients = relationship("ShoutOutRecipient", back_populates="shoutout", cascade="all, delete-orphan")
-    reactions = relationship("Reaction", back_populates="shoutout", cascade="all, delete-orphan")
-    comments = relationship("Comment", back_populates="shoutout", cascade="all, delete-orphan")
+    recipients = relationship("ShoutOutRecipient", back_populates="shoutout", cascade="all, delete-orphan", passive_deletes=True)
+    reactions = relationship("Reaction", back_populates="shoutout", cascade="all, delete-orphan", passive_deletes=True)
+    comments = relationship("Comment", back_populates="shoutout", cascade="all, delete-orphan", passive_deletes=True)
 
 class ShoutOutRecipient(Base):
     __tablename__ = "shoutout_recipients"
     id = Column(Integer, primary_key=True, index=True)
-    shoutout_id = Column(Integer, ForeignKey("shoutouts.id"))
-    recipient_id = Column(Integer, ForeignKey("users.id"))
+    shoutout_id = Column(Integer, ForeignKey("shoutouts.id", ondelete="CASCADE"))
+    recipient_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     
     shoutout = relationship("ShoutOut", back_populates="recipients")
     recipient = relationship("User", back_populates="received_shoutouts")
@@ -63,27 +72,56 @@ class ShoutOutRecipient(Base):
 
 class Reaction(Base):
     __tablename__ = "reactions"
+    __table_args__ = (
+        Index("ix_reactions_shoutout_id_type", "shoutout_id", "reaction_type"),  # feed counts
+        Index("ix_reactions_user_id_shoutout_id", "user_id", "shoutout_id"),     # viewer state
+        # One reaction of each type per user and post (toggle_reaction relies on it)
+        Index("uq_reactions_user_shoutout_type", "user_id", "shoutout_id", "reaction_type", unique=True),
+    )
     id = Column(Integer, primary_key=True, index=True)
     reaction_type = Column(String)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    shoutout_id = Column(Integer, ForeignKey("shoutouts.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    shoutout_id = Column(Integer, ForeignKey("shoutouts.id", ondelete="CASCADE"))
     user = relationship("User", back_populates="reactions")
     shoutout = relationship("ShoutOut", back_populates="reactions")
 
 class Comment(Base):
     __tablename__ = "comments"
+    # Serves comment previews and cursor-paginated threads
+    __table_args__ = (
+        Index("ix_comments_shoutout_id_id", "shoutout_id", "id"),
+        Index("ix_comments_user_id_shoutout_id", "user_id", "shoutout_id"),  # viewer state
+    )
     id = Column(Integer, primary_key=True, index=True)
     text = Column(Text)
-    user_id = Column(Integer, ForeignKey("users.id"))
-    shoutout_id = Column(Integer, ForeignKey("shoutouts.id"))
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    shoutout_id = Column(Integer, ForeignKey("shoutouts.id", ondelete="CASCADE"))
     user = relationship("User", back_populates="comments")
     shoutout = relationship("ShoutOut", back_populates="comments")
 
 class AdminLog(Base):
     __tablename__ = "admin_logs"
     id = Column(Integer, primary_key=True, index=True)
-    admin_id = Column(Integer, ForeignKey("users.id"))
+    admin_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
     action = Column(String)
     target_id = Column(Integer)
     target_type = Column(String)
-    timestamp = Column(DateTime, default=func.now())
\ No newline at end of file
+    timestamp = Column(DateTime, default=func.now())
+class Job(Base):
+    __tablename__ = "jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    status = Column(String, default="queued", index=True)  # queued, running, done, failed
+    progress = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)
+    max_retries = Column(Integer, default=3)
+    params = Column(Text)   # JSON
+    result = Column(Text)   # JSON, may point at an artifact file on disk
+    error = Column(Text)
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    # Set on claim: the worker ("host:pid:thread") and how long its claim holds without a heartbeat
+    worker = Column(String)
+    lease_until = Column(DateTime)
+    run_after = Column(DateTime)  # retry backoff: not claimed before this time
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -0,0 +1,308 @@
+import contextvars
+import functools
+import inspect
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Admin-only profiling: an on-demand sampling profiler and automatic capture of
+# slow requests (stack samples + SQL log). Nothing is hooked in while both are off.
+
+DEFAULT_INTERVAL_MS = 5
+MAX_STACK_DEPTH = 64
+MAX_SQL_PER_REQUEST = 500
+
+_current_capture = contextvars.ContextVar("profiling_capture", default=None)
+
+
+def _folded_stack(frame):
+    # "outer;...;inner" in the collapsed-stack format used by flamegraph.pl and speedscope
+    parts = []
+    while frame is not None and len(parts) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def _to_folded_text(counter: Counter):
+    return "\n".join(f"{stack} {count}" for stack, count in counter.most_common()) + "\n"
+
+
+class RequestCapture:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc)
+        self.start = time.monotonic()
+        self.end = None
+        self.status = None
+        self.threads = set()  # threads currently running this request's endpoint
+        self.samples = Counter()
+        self.sql = []
+
+
+class Profiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+
+        # On-demand window
+        self.window_interval = DEFAULT_INTERVAL_MS / 1000
+        self.window_until = None
+        self.window_samples = Counter()
+        self.window_result = None
+        self.window_meta = None
+
+        # Slow-request capture
+        self.slow_interval = DEFAULT_INTERVAL_MS / 1000
+        self.slow_threshold_ms = None
+        self._active = set()  # RequestCaptures in flight
+        self._ids = itertools.count(1)
+        self.captures = deque(maxlen=int(os.getenv("PROFILE_RING_SIZE", "20")))
+
+    # ---------- sampler thread ----------
+
+    @property
+    def slow_capture_enabled(self):
+        return self.slow_threshold_ms is not None
+
+    def _window_active(self):
+        return self.window_until is not None
+
+    def _ensure_sampler(self):
+        # Called with the lock held; the loop exits under the same lock, so no restart is missed
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+            self._thread.start()
+
+    def _sample_loop(self):
+        # The window and slow capture each keep their own interval; the loop
+        # wakes for whichever is due next
+        me = threading.get_ident()
+        window_due = slow_due = time.monotonic()
+        while True:
+            with self._lock:
+                window_on, slow_on = self._window_active(), self.slow_capture_enabled
+                if not (window_on or slow_on):
+                    self._thread = None
+                    return
+                now = time.monotonic()
+                do_window = window_on and now >= window_due
+                do_slow = slow_on and now >= slow_due
+                frames = sys._current_frames() if do_window or do_slow else {}
+                stacks = {}
+
+                if do_window:
+                    stacks = {tid: _folded_stack(frame) for tid, frame in frames.items() if tid != me}
+                    self.window_samples.update(stacks.values())
+                    if now >= self.window_until:
+                        self._finish_window()
+                    window_due = now + self.window_interval
+
+                # Only threads running an in-flight request's endpoint are sampled, and a
+                # thread shared by several requests (the event loop) is attributed to none
+                if do_slow:
+                    owners = Counter(tid for capture in self._active for tid in capture.threads)
+                    for capture in self._active:
+                        for tid in capture.threads:
+                            if owners[tid] == 1 and tid in frames:
+                                if tid not in stacks:
+                                    stacks[tid] = _folded_stack(frames[tid])
+                                capture.samples[stacks[tid]] += 1
+                    slow_due = now + self.slow_interval
+                del frames
+
+                due = [d for d, on in ((window_due, self._window_active()), (slow_due, slow_on)) if on]
+            time.sleep(max(0.0, min(due, default=now) - time.monotonic()))
+
+    # ---------- on-demand window ----------
+
+    def start_window(self, seconds: float, interval_ms: int = DEFAULT_INTERVAL_MS):
+        with self._lock:
+            if self._window_active():
+                raise RuntimeError("A profiling window is already running")
+            self.window_interval = interval_ms / 1000
+            self.window_samples = Counter()
+            self.window_result = None
+            self.window_meta = {
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "seconds": seconds,
+                "interval_ms": interval_ms,
+            }
+            self.window_until = time.monotonic() + seconds
+            self._ensure_sampler()
+
+    def _finish_window(self):
+        self.window_result = _to_folded_text(self.window_samples)
+        self.window_meta["samples"] = sum(self.window_samples.values())
+        self.window_samples = Counter()
+        self.window_until = None
+
+    def stop_window(self):
+        with self._lock:
+            if self._window_active():
+                self._finish_window()
+
+    # ---------- slow-request capture ----------
+
+    def enable_slow_capture(self, threshold_ms: int, interval_ms: int = DEFAULT_INTERVAL_MS):
+        with self._lock:
+            self.slow_interval = interval_ms / 1000
+            # Listen on the Engine class so db.configure_engine() swapping the engine keeps the SQL log
+            if self.slow_threshold_ms is None:
+                event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            self.slow_threshold_ms = threshold_ms
+            self._ensure_sampler()
+
+    def disable_slow_capture(self):
+        with self._lock:
+            if self.slow_threshold_ms is None:
+                return
+            self.slow_threshold_ms = None
+            event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    def begin_request(self, capture: RequestCapture):
+        with self._lock:
+            self._active.add(capture)
+
+    def attach_thread(self, capture: RequestCapture):
+        with self._lock:
+            capture.threads.add(threading.get_ident())
+
+    def detach_thread(self, capture: RequestCapture):
+        with self._lock:
+            capture.threads.discard(threading.get_ident())
+
+    def finish_request(self, capture: RequestCapture):
+        capture.end = time.monotonic()
+        duration_ms = (capture.end - capture.start) * 1000
+
+        with self._lock:
+            self._active.discard(capture)
+            threshold = self.slow_threshold_ms
+            if threshold is None or duration_ms < threshold:
+                return
+
+            self.captures.append({
+                "id": next(self._ids),
+                "method": capture.method,
+                "path": capture.path,
+                "status": capture.status,
+                "duration_ms": round(duration_ms, 1),
+                "started_at": capture.started_at.isoformat(),
+                "samples": sum(capture.samples.values()),
+                "folded": _to_folded_text(capture.samples),
+                "sql": capture.sql,
+            })
+
+    def get_capture(self, capture_id: int):
+        with self._lock:
+            return next((c for c in self.captures if c["id"] == capture_id), None)
+
+    def status(self):
+        with self._lock:
+            return {
+                "window_running": self._window_active(),
+                "window": self.window_meta,
+                "slow_capture_enabled": self.slow_capture_enabled,
+                "slow_threshold_ms": self.slow_threshold_ms,
+                "slow_interval_ms": round(self.slow_interval * 1000, 2),
+                "captures": [{k: v for k, v in c.items() if k not in ("folded", "sql")} for c in self.captures],
+            }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    capture = _current_capture.get()
+    if capture is not None:
+        conn.info.setdefault("profiling_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    capture = _current_capture.get()
+    starts = conn.info.get("profiling_start")
+    if capture is None or not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    if len(capture.sql) < MAX_SQL_PER_REQUEST:
+        capture.sql.append({"statement": statement, "ms": round(elapsed_ms, 3)})
+
+
+def _track_thread(endpoint):
+    # Registers the thread running the endpoint with the request's capture for
+    # exactly as long as the endpoint runs (threadpool threads serve many requests)
+    if getattr(endpoint, "_tracks_thread", False):
+        return endpoint  # include_router rebuilds routes from already wrapped endpoints
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            capture = _current_capture.get()
+            if capture is None:
+                return await endpoint(*args, **kwargs)
+            profiler.attach_thread(capture)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profiler.detach_thread(capture)
+        async_wrapper._tracks_thread = True
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        capture = _current_capture.get()
+        if capture is None:
+            return endpoint(*args, **kwargs)
+        profiler.attach_thread(capture)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profiler.detach_thread(capture)
+    wrapper._tracks_thread = True
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    # route_class for routers whose endpoints should show up in slow-request captures
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _track_thread(endpoint), **kwargs)
+
+
+class ProfilingMiddleware:
+    # Plain ASGI middleware so the disabled path is a single attribute check
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.slow_capture_enabled:
+            return await self.app(scope, receive, send)
+
+        capture = RequestCapture(scope["method"], scope["path"])
+        token = _current_capture.set(capture)
+        profiler.begin_request(capture)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                capture.status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_capture.reset(token)
+            profiler.finish_request(capture)
+
+
+profiler = Profiler()
+
+# PROFILE_SLOW_MS turns on slow-request capture at startup
+if os.getenv("PROFILE_SLOW_MS"):
+    profiler.enable_slow_capture(int(os.getenv("PROFILE_SLOW_MS")))
@@ -0,0 +1,203 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models import User, AdminLog
+from utils import hash_password
+
+REQUIRED_FIELDS = ("name", "email", "password", "department")
+BATCH_SIZE = 1000
+EMAIL_QUERY_CHUNK = 900  # stay under SQLite's bound-parameter limit
+POOL_THRESHOLD = 50      # below this a process pool costs more than it saves
+INLINE_MAX_ROWS = 20     # larger uploads are provisioned in the job queue, not in the request
+# Never fork: hashing is started from a request thread of a multithreaded server
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def parse_users(content: str, fmt: str = "csv"):
+    # Returns a list of dicts, one per input row (CSV with header, or JSON lines)
+    if fmt == "jsonl":
+        rows = []
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            rows.append(row if isinstance(row, dict) else {"_error": "Invalid JSON line"})
+        return rows
+    return list(csv.DictReader(StringIO(content)))
+
+
+def detect_format(filename: str, content: str):
+    if filename and filename.lower().endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    if filename and filename.lower().endswith(".csv"):
+        return "csv"
+    return "jsonl" if content.lstrip().startswith("{") else "csv"
+
+
+def _is_true(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in ("1", "true", "yes", "y")
+
+
+def _hash_all(passwords, workers=None, on_progress=None):
+    # bcrypt is CPU bound, so spread it across processes instead of threads
+    if len(passwords) < POOL_THRESHOLD:
+        return [hash_password(p) for p in passwords]
+    workers = workers or os.cpu_count() or 1
+    hashes = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(START_METHOD)) as pool:
+        for hashed in pool.map(hash_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))):
+            hashes.append(hashed)
+            if on_progress and len(hashes) % 100 == 0:
+                on_progress(len(hashes) * 90 // len(passwords))
+    return hashes
+
+
+def _existing_emails(db: Session, emails):
+    # Emails are stored as typed, so compare lowercased on both sides
+    existing = set()
+    emails = list(emails)
+    stored = func.lower(User.email)
+    for i in range(0, len(emails), EMAIL_QUERY_CHUNK):
+        chunk = emails[i:i + EMAIL_QUERY_CHUNK]
+        existing.update(e for (e,) in db.query(stored).filter(stored.in_(chunk)))
+    return existing
+
+
+def provision_users(db: Session, rows, admin_id=None, workers=None, on_progress=None):
+    report = []
+    pending = []  # (report entry, user fields)
+    seen = set()
+
+    # 1. Validate rows and de-duplicate inside the file
+    for i, row in enumerate(rows, start=1):
+        email = row.get("email")
+        entry = {"row": i, "email": (email.strip().lower() or None) if isinstance(email, str) else None}
+        report.append(entry)
+
+        if row.get("_error"):
+            entry.update(status="error", detail=row["_error"])
+            continue
+        missing = [f for f in REQUIRED_FIELDS if not str(row.get(f) or "").strip()]
+        if missing:
+            entry.update(status="error", detail=f"Missing fields: {', '.join(missing)}")
+            continue
+        # JSONL can carry numbers, lists etc.
+        if not isinstance(email, str):
+            entry.update(status="error", detail="Email must be a string")
+            continue
+        if entry["email"] in seen:
+            entry.update(status="skipped", detail="Duplicate email in file")
+            continue
+        seen.add(entry["email"])
+        pending.append((entry, row))
+
+    # 2. De-duplicate against the DB with one set query
+    existing = _existing_emails(db, (entry["email"] for entry, _ in pending))
+    to_create = []
+    for entry, row in pending:
+        if entry["email"] in existing:
+            entry.update(status="skipped", detail="Email already registered")
+        else:
+            to_create.append((entry, row))
+
+    # 3. Hash passwords in parallel
+    # (hashing is most of the work, so it gets 90% of the progress)
+    hashes = _hash_all([str(row["password"]) for _, row in to_create], workers=workers, on_progress=on_progress)
+
+    # 4. Insert in batched transactions
+    created = 0
+    for start in range(0, len(to_create), BATCH_SIZE):
+        batch = to_create[start:start + BATCH_SIZE]
+        users = []
+        for (entry, row), hashed in zip(batch, hashes[start:start + BATCH_SIZE]):
+            is_admin_user = _is_true(row.get("is_admin"))
+            users.append(User(
+                name=str(row["name"]).strip(),
+                email=entry["email"],
+                password=hashed,
+                department=str(row["department"]).strip(),
+                role="admin" if is_admin_user else "employee",
+                is_admin=is_admin_user
+            ))
+        try:
+            db.add_all(users)
+            db.flush()
+            ids = [u.id for u in users]  # read before commit expires the objects
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            for entry, _ in batch:
+                entry.update(status="error", detail=f"Database error: {str(e)}")
+            continue
+        for (entry, _), user_id in zip(batch, ids):
+            entry.update(status="created", id=user_id)
+        created += len(users)
+
+    # 5. One summary audit row for the whole import
+    if admin_id is not None:
+        db.add(AdminLog(admin_id=admin_id, action=f"BULK_CREATED_USERS: {created}", target_type="user"))
+        db.commit()
+
+    summary = {
+        "total": len(report),
+        "created": created,
+        "skipped": sum(1 for r in report if r.get("status") == "skipped"),
+        "errors": sum(1 for r in report if r.get("status") == "error"),
+    }
+    return {"summary": summary, "results": report}
+
+
+def main():
+    from db import SessionLocal, init_schema
+
+    parser = argparse.ArgumentParser(description="Bulk-provision BragBoard users from CSV or JSONL")
+    parser.add_argument("file", help="CSV (with header) or JSONL file of users")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Input format (default: from file extension)")
+    parser.add_argument("--admin-email", help="Admin recorded in the audit log")
+    parser.add_argument("--workers", type=int, help="Password hashing processes (default: CPU count)")
+    parser.add_argument("--report", help="Write the per-row JSON report to this path")
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8-sig") as f:
+        content = f.read()
+
+    # Same schema check as the app's startup, so an older database gets the new columns first
+    init_schema()
+    db = SessionLocal()
+    try:
+        admin_id = None
+        if args.admin_email:
+            admin = (
+                db.query(User)
+                .filter(func.lower(User.email) == args.admin_email.strip().lower(), User.is_deleted == False)
+                .first()
+            )
+            if not admin or not admin.is_admin:
+                parser.error(f"{args.admin_email} is not an admin account")
+            admin_id = admin.id
+
+        rows = parse_users(content, args.format or detect_format(args.file, content))
+        result = provision_users(db, rows, admin_id=admin_id, workers=args.workers)
+    finally:
+        db.close()
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    print(json.dumps(result["summary"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import os
+from typing import List
+from pydantic import BaseModel, Field
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+# Runtime configuration for create_app(); defaults come from the environment
+class Settings(BaseModel):
+    database_url: str = Field(default_factory=lambda: os.getenv("DATABASE_URL", "sqlite:///./bragboard.db"))
+    # Run create_all + column/index checks at startup (once per process and database)
+    schema_check: bool = Field(default_factory=lambda: _env_bool("SCHEMA_CHECK", True))
+    # Warm the connection pool, statement cache and in-memory indexes before reporting ready
+    warmup: bool = Field(default_factory=lambda: _env_bool("WARMUP", True))
+    job_workers: int = Field(default_factory=lambda: int(os.getenv("JOB_WORKERS", "2")))
+    cors_origins: List[str] = Field(default_factory=lambda: os.getenv("CORS_ORIGINS", "http://localhost:5173").split(","))
@@ -7,7 +7,14 @@ def create_shoutout(db: Session, message: str, sender_id: int, recipient_ids: li
     db.commit()
     db.refresh(shoutout)
 
-    for rid in set(recipient_ids):
+    # Only tag users that exist and are not deleted
+    valid_ids = set()
+    if recipient_ids:
+        valid_ids = {
+            uid for (uid,) in db.query(User.id).filter(User.id.in_(set(recipient_ids)), User.is_deleted == False)
+        }
+
+    for rid in valid_ids:
         if rid != sender_id:
             db.add(
                 ShoutOutRecipient(
@@ -19,24 +26,23 @@ def create_shoutout(db: Session, message: str, sender_id: int, recipient_ids: li
     db.commit()
     return shoutout
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import select, func, or_
 # Add Comment and User to this import list
-from models import ShoutOut, ShoutOutRecipient, User, Comment 
+from models import ShoutOut, ShoutOutRecipient, User, Comment, Reaction
 
-def get_shoutouts(db: Session, department=None, sender_id=None, from_date=None, to_date=None, include_reported=True):
-    query = (
-        db.query(ShoutOut)
-        .options(
-            joinedload(ShoutOut.sender),
-            joinedload(ShoutOut.recipients).joinedload(ShoutOutRecipient.recipient),
-            joinedload(ShoutOut.reactions),
-            joinedload(ShoutOut.comments).joinedload(Comment.user) 
-        )
-    )
+def get_shoutouts(db: Session, department=None, sender_id=None, from_date=None, to_date=None, include_reported=True, with_recipients=True):
+    query = db.query(ShoutOut).options(contains_eager(ShoutOut.sender))  # filled from the User join below
+
+    # Recipients are only loaded when the caller renders them
+    if with_recipients:
+        query = query.options(joinedload(ShoutOut.recipients).joinedload(ShoutOutRecipient.recipient))
+
+    # Hide posts from soft-deleted users until the purge removes them
+    query = query.join(User, ShoutOut.sender_id == User.id).filter(User.is_deleted == False)
 
     if department:
         # Check if department is a list (Multi-filter) or a single string
-        query = query.join(User, ShoutOut.sender_id == User.id)
         if isinstance(department, list):
             query = query.filter(User.department.in_(department))
         else:
@@ -54,6 +60,81 @@ def get_shoutouts(db: Session, department=None, sender_id=None, from_date=None,
 
     return query.order_by(ShoutOut.created_at.desc()).all()
 
+def get_reaction_counts(db: Session, shoutout_ids: list):
+    # {shoutout_id: {reaction_type: count}} from one GROUP BY instead of loading every reaction row
+    counts = {}
+    if not shoutout_ids:
+        return counts
+    rows = (
+        db.query(Reaction.shoutout_id, Reaction.reaction_type, func.count(Reaction.id))
+        .filter(Reaction.shoutout_id.in_(shoutout_ids))
+        .group_by(Reaction.shoutout_id, Reaction.reaction_type)
+        .all()
+    )
+    for shoutout_id, reaction_type, count in rows:
+        counts.setdefault(shoutout_id, {})[reaction_type] = count
+    return counts
+
+def _comment_dict(comment_id, text, user_id, user_name):
+    return {
+        "id": comment_id,
+        "text": text,
+        # If the user who commented was deleted, show "Deleted User"
+        "user": {"id": user_id, "name": user_name} if user_name is not None else {"name": "Deleted User"}
+    }
+
+def get_comment_previews(db: Session, shoutout_ids: list, per_post: int = 3):
+    # Latest `per_post` comments plus the total count for every shoutout, in one query.
+    # Returns ({shoutout_id: [comments oldest first]}, {shoutout_id: count})
+    previews, counts = {}, {}
+    if not shoutout_ids:
+        return previews, counts
+
+    ranked = (
+        select(
+            Comment.id,
+            Comment.shoutout_id,
+            Comment.text,
+            Comment.user_id,
+            func.row_number().over(partition_by=Comment.shoutout_id, order_by=Comment.id.desc()).label("rn"),
+            func.count().over(partition_by=Comment.shoutout_id).label("total"),
+        )
+        .join(User, User.id == Comment.user_id)
+        .where(Comment.shoutout_id.in_(shoutout_ids), User.is_deleted == False)
+        .subquery()
+    )
+    rows = db.execute(
+        select(ranked, User.name)
+        .join(User, User.id == ranked.c.user_id)
+        # rn == 1 keeps the count even when no previews are requested
+        .where(or_(ranked.c.rn <= per_post, ranked.c.rn == 1))
+        .order_by(ranked.c.shoutout_id, ranked.c.id)
+    ).all()
+
+    for r in rows:
+        counts[r.shoutout_id] = r.total
+        if r.rn <= per_post:
+            previews.setdefault(r.shoutout_id, []).append(_comment_dict(r.id, r.text, r.user_id, r.name))
+    return previews, counts
+
+def get_comment_thread(db: Session, shoutout_id: int, cursor: int = None, limit: int = 50):
+    # Keyset pagination over (shoutout_id, id); cursor is the last comment id already seen
+    query = (
+        db.query(Comment.id, Comment.text, Comment.user_id, User.name)
+        .join(User, User.id == Comment.user_id)
+        .filter(Comment.shoutout_id == shoutout_id, User.is_deleted == False)
+    )
+    if cursor is not None:
+        query = query.filter(Comment.id > cursor)
+    rows = query.order_by(Comment.id).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [_comment_dict(r.id, r.text, r.user_id, r.name) for r in rows],
+        "next_cursor": rows[-1].id if has_more else None
+    }
+
 def get_user_shoutouts(db: Session, user_id: int):
     return (
         db.query(ShoutOut)
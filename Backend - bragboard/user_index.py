@@ -0,0 +1,102 @@
+import threading
+import time
+from bisect import bisect_left, insort
+from sqlalchemy.orm import Session
+from models import User
+
+# In-memory prefix index used for recipient autocomplete.
+# Keys are lowercased full names, each name token and the email, kept in a
+# sorted list so a prefix lookup is a single bisect followed by a short scan.
+INDEX_TTL = 60  # seconds; picks up users written by other workers or the provisioning CLI
+
+class UserIndex:
+    def __init__(self, ttl: float = INDEX_TTL):
+        self._lock = threading.Lock()
+        self._keys = []    # sorted list of (key, user_id)
+        self._users = {}   # user_id -> {"id", "name", "email", "department"}
+        self._loaded = False
+        self._loaded_at = 0.0
+        self.ttl = ttl
+
+    @staticmethod
+    def _keys_for(name: str, email: str):
+        name = (name or "").lower().strip()
+        keys = {name, (email or "").lower()}
+        keys.update(name.split())
+        keys.discard("")
+        return keys
+
+    def _add(self, user_id: int, name: str, email: str, department: str):
+        self._users[user_id] = {"id": user_id, "name": name, "email": email, "department": department}
+        for key in self._keys_for(name, email):
+            insort(self._keys, (key, user_id))
+
+    def _remove(self, user_id: int):
+        record = self._users.pop(user_id, None)
+        if not record:
+            return
+        for key in self._keys_for(record["name"], record["email"]):
+            i = bisect_left(self._keys, (key, user_id))
+            if i < len(self._keys) and self._keys[i] == (key, user_id):
+                del self._keys[i]
+
+    def _fresh(self):
+        return self._loaded and time.monotonic() - self._loaded_at < self.ttl
+
+    def ensure_loaded(self, db: Session):
+        if self._fresh():
+            return
+        with self._lock:
+            if self._fresh():
+                return
+            rows = db.query(User.id, User.name, User.email, User.department).filter(User.is_deleted == False).all()
+            self._keys, self._users = [], {}
+            for r in rows:
+                self._users[r.id] = {"id": r.id, "name": r.name, "email": r.email, "department": r.department}
+                self._keys.extend((key, r.id) for key in self._keys_for(r.name, r.email))
+            self._keys.sort()
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+
+    def add(self, user: User):
+        # Before the first search the index is built from the DB, so there is nothing to update yet
+        with self._lock:
+            if self._loaded:
+                self._remove(user.id)
+                self._add(user.id, user.name, user.email, user.department)
+
+    def remove(self, user_id: int):
+        with self._lock:
+            if self._loaded:
+                self._remove(user_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self._keys, self._users = [], {}
+
+    def search(self, db: Session, prefix: str = "", department=None, limit: int = 20, exclude_id=None):
+        self.ensure_loaded(db)
+        prefix = (prefix or "").lower().strip()
+        dept = department.lower() if department else None
+        results, seen = [], set()
+
+        with self._lock:
+            start = bisect_left(self._keys, (prefix,))
+            for i in range(start, len(self._keys)):
+                key, user_id = self._keys[i]
+                if not key.startswith(prefix):
+                    break
+                if user_id in seen or user_id == exclude_id:
+                    continue
+                seen.add(user_id)
+                record = self._users[user_id]
+                if dept and (record["department"] or "").lower() != dept:
+                    continue
+                results.append(record)
+                if len(results) >= limit:
+                    break
+
+        return [{"id": r["id"], "name": r["name"], "department": r["department"]} for r in results]
+
+user_index = UserIndex()
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy.orm import Session
+from models import Reaction, Comment
+
+# Per-viewer state for the feed (my reactions, whether I commented), cached in
+# memory and kept current by the reaction/comment endpoints that change it.
+CACHE_USERS = 1000
+CACHE_TTL = 60  # seconds; bounds staleness when several workers write
+
+class _UserState:
+    def __init__(self):
+        self.created = time.monotonic()
+        self.known = set()      # shoutout ids loaded from the DB
+        self.reactions = {}     # shoutout_id -> set of reaction types
+        self.commented = set()  # shoutout ids
+        self.writes = 0         # bumped by every set_reaction/mark_commented
+        self.touched = {}       # shoutout_id -> writes count at its last change
+
+    def touch(self, shoutout_id: int):
+        self.writes += 1
+        self.touched[shoutout_id] = self.writes
+
+class ViewerStateCache:
+    def __init__(self, max_users: int = CACHE_USERS, ttl: float = CACHE_TTL):
+        self._lock = threading.Lock()
+        self._users = OrderedDict()
+        self.max_users = max_users
+        self.ttl = ttl
+
+    def _entry(self, user_id: int, create: bool = False):
+        entry = self._users.get(user_id)
+        if entry and time.monotonic() - entry.created > self.ttl:
+            del self._users[user_id]
+            entry = None
+        if entry is None and create:
+            entry = self._users[user_id] = _UserState()
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        if entry:
+            self._users.move_to_end(user_id)
+        return entry
+
+    def get_many(self, db: Session, user_id: int, shoutout_ids: list):
+        # {shoutout_id: {"my_reactions": [...], "commented": bool}} with one batched
+        # query each for reactions and comments, only for ids not cached yet
+        with self._lock:
+            entry = self._entry(user_id, create=True)
+            missing = [sid for sid in shoutout_ids if sid not in entry.known]
+            writes_before = entry.writes
+
+        loaded = {}
+        if missing:
+            loaded = {sid: {"my_reactions": set(), "commented": False} for sid in missing}
+            reactions = (
+                db.query(Reaction.shoutout_id, Reaction.reaction_type)
+                .filter(Reaction.user_id == user_id, Reaction.shoutout_id.in_(missing))
+                .all()
+            )
+            for sid, reaction_type in reactions:
+                loaded[sid]["my_reactions"].add(reaction_type)
+            commented = (
+                db.query(Comment.shoutout_id)
+                .filter(Comment.user_id == user_id, Comment.shoutout_id.in_(missing))
+                .distinct()
+                .all()
+            )
+            for (sid,) in commented:
+                loaded[sid]["commented"] = True
+
+            with self._lock:
+                for sid, state in loaded.items():
+                    # A toggle that landed while we were querying may be missing from
+                    # these rows; leave that id uncached so the next call reads it again
+                    if sid in entry.known or entry.touched.get(sid, 0) > writes_before:
+                        continue
+                    entry.reactions[sid] = set(state["my_reactions"])
+                    if state["commented"]:
+                        entry.commented.add(sid)
+                    entry.known.add(sid)
+
+        with self._lock:
+            return {
+                sid: {
+                    "my_reactions": sorted(entry.reactions.get(sid, ())),
+                    "commented": sid in entry.commented,
+                } if sid in entry.known else {
+                    "my_reactions": sorted(loaded[sid]["my_reactions"]),
+                    "commented": loaded[sid]["commented"],
+                }
+                for sid in shoutout_ids
+            }
+
+    def my_reactions(self, user_id: int, shoutout_id: int):
+        with self._lock:
+            entry = self._entry(user_id)
+            if not entry or shoutout_id not in entry.known:
+                return None
+            return sorted(entry.reactions.get(shoutout_id, ()))
+
+    def set_reaction(self, user_id: int, shoutout_id: int, reaction_type: str, present: bool):
+        with self._lock:
+            entry = self._entry(user_id)
+            if not entry:
+                return
+            entry.touch(shoutout_id)
+            if shoutout_id not in entry.known:
+                return
+            types = entry.reactions.setdefault(shoutout_id, set())
+            if present:
+                types.add(reaction_type)
+            else:
+                types.discard(reaction_type)
+
+    def mark_commented(self, user_id: int, shoutout_id: int):
+        with self._lock:
+            entry = self._entry(user_id)
+            if not entry:
+                return
+            entry.touch(shoutout_id)
+            if shoutout_id in entry.known:
+                entry.commented.add(shoutout_id)
+
+    def invalidate(self, user_id: int = None):
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+viewer_state = ViewerStateCache()
@@ -7,3 +7,17 @@ export const createUser = (payload) => {
 export const getAdminStats = () => {
   return api.get("/admin/stats");
 };
+
+export const bulkCreateUsers = (file) => {
+  const form = new FormData();
+  form.append("file", file);
+  return api.post("/admin/users/bulk", form);
+};
+
+export const getJob = (id) => {
+  return api.get(`/admin/jobs/${id}`);
+};
+
+export const downloadJobResult = (id) => {
+  return api.get(`/admin/jobs/${id}/download`, { responseType: "blob" });
+};
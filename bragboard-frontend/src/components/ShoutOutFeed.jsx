@@ -81,22 +81,13 @@ export default function ShoutOutFeed({ refreshKey, department }) {
         reaction_type: type,
       });
 
+      // The server returns the new counts and my_reactions, so no refetch is needed
       setShoutouts((prev) =>
-        prev.map((s) => {
-          if (s.id === shoutoutId) {
-            const currentReactions = s.reactions || { like: 0, clap: 0, star: 0 };
-            const currentCount = currentReactions[type] || 0;
-            const newCount = res.data.action === "added" 
-              ? currentCount + 1 
-              : Math.max(0, currentCount - 1);
-
-            return {
-              ...s,
-              reactions: { ...currentReactions, [type]: newCount },
-            };
-          }
-          return s;
-        })
+        prev.map((s) =>
+          s.id === shoutoutId
+            ? { ...s, reactions: res.data.reactions, my_reactions: res.data.my_reactions }
+            : s
+        )
       );
     } catch (err) {
       console.error("Reaction failed:", err);
@@ -114,7 +105,11 @@ export default function ShoutOutFeed({ refreshKey, department }) {
       setShoutouts((prev) =>
         prev.map((s) => {
           if (s.id === shoutoutId) {
-            return { ...s, comments: [...(s.comments || []), res.data] };
+            return {
+              ...s,
+              comments: [...(s.comments || []), res.data],
+              comment_count: (s.comment_count || 0) + 1,
+            };
           }
           return s;
         })
@@ -125,6 +120,27 @@ export default function ShoutOutFeed({ refreshKey, department }) {
     }
   };
 
+  // The feed only carries the latest comments; fetch the whole thread on demand
+  const loadAllComments = async (shoutoutId) => {
+    try {
+      let comments = [];
+      let cursor = null;
+      do {
+        const res = await API.get(`/shoutouts/${shoutoutId}/comments`, {
+          params: { limit: 200, ...(cursor !== null && { cursor }) },
+        });
+        comments = [...comments, ...res.data.items];
+        cursor = res.data.next_cursor;
+      } while (cursor !== null);
+
+      setShoutouts((prev) =>
+        prev.map((s) => (s.id === shoutoutId ? { ...s, comments } : s))
+      );
+    } catch (err) {
+      console.error("Loading comments failed:", err);
+    }
+  };
+
   if (loading) return <p className="text-sm text-gray-500 p-4">Loading feed...</p>;
   if (error) return <p className="text-sm text-red-500 p-4">{error}</p>;
 
@@ -196,7 +212,11 @@ export default function ShoutOutFeed({ refreshKey, department }) {
                 <button
                   key={btn.type}
                   onClick={() => toggleReaction(s.id, btn.type)}
-                  className="flex items-center gap-2 px-3 py-1.5 rounded-full bg-gray-50 hover:bg-indigo-50 hover:text-indigo-600 transition-all active:scale-90"
+                  className={`flex items-center gap-2 px-3 py-1.5 rounded-full transition-all active:scale-90 ${
+                    s.my_reactions?.includes(btn.type)
+                      ? "bg-indigo-100 text-indigo-700"
+                      : "bg-gray-50 hover:bg-indigo-50 hover:text-indigo-600"
+                  }`}
                 >
                   <span className="text-base">{btn.emoji}</span>
                   <span className="font-bold text-sm">{s.reactions?.[btn.type] || 0}</span>
@@ -206,6 +226,14 @@ export default function ShoutOutFeed({ refreshKey, department }) {
 
             {/* Comments Section */}
             <div className="space-y-3 bg-gray-50/50 rounded-xl p-4">
+              {s.comment_count > (s.comments?.length || 0) && (
+                <button
+                  onClick={() => loadAllComments(s.id)}
+                  className="text-xs font-bold text-indigo-600 hover:underline"
+                >
+                  View all {s.comment_count} comments
+                </button>
+              )}
               {s.comments?.length > 0 && (
                 <div className="space-y-3 mb-4">
                   {s.comments.map((c) => (
@@ -9,22 +9,20 @@ export default function ShoutOutForm({ onSuccess }) {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
 
+  // Search teammates through the indexed autocomplete endpoint
   useEffect(() => {
-    const fetchUsers = async () => {
+    const timer = setTimeout(async () => {
       try {
-        const res = await API.get("/users");
+        const res = await API.get("/users/search", {
+          params: { prefix: searchTerm, limit: 20 },
+        });
         setUsers(res.data);
       } catch {
         setError("Failed to load users");
       }
-    };
-    fetchUsers();
-  }, []);
-
-  // Filter users based on search term
-  const filteredUsers = users.filter(u => 
-    u.name.toLowerCase().includes(searchTerm.toLowerCase())
-  );
+    }, 200);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
 
   const toggleRecipient = (id) => {
     setSelectedRecipients((prev) =>
@@ -94,8 +92,8 @@ export default function ShoutOutForm({ onSuccess }) {
         />
 
         <div className="max-h-40 overflow-y-auto border border-gray-100 rounded-xl p-3 space-y-1 bg-white">
-          {filteredUsers.length > 0 ? (
-            filteredUsers.map((u) => (
+          {users.length > 0 ? (
+            users.map((u) => (
               <label
                 key={u.id}
                 className={`flex items-center gap-3 p-2 rounded-lg cursor-pointer transition-colors ${
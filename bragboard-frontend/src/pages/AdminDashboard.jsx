@@ -1,9 +1,26 @@
 import { useEffect, useState } from "react";
 import API from "../api/axios";
+import { bulkCreateUsers, getJob, downloadJobResult } from "../api/admin";
+
+const USERS_PAGE_SIZE = 50;
+const JOB_POLL_MS = 2000;
+
+const saveBlob = (blob, filename) => {
+  const url = window.URL.createObjectURL(blob);
+  const a = document.createElement("a");
+  a.href = url;
+  a.download = filename;
+  a.click();
+  window.URL.revokeObjectURL(url);
+};
 
 export default function AdminDashboard() {
   const [stats, setStats] = useState(null);
   const [users, setUsers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingUsers, setLoadingUsers] = useState(false);
+  const [bulkFile, setBulkFile] = useState(null);
+  const [bulkStatus, setBulkStatus] = useState(null); // { state, progress, summary, jobId, report }
 
   useEffect(() => {
     fetchAdminData();
@@ -13,23 +30,75 @@ export default function AdminDashboard() {
     try {
       const [statsRes, usersRes] = await Promise.all([
         API.get("/admin/stats"),
-        API.get("/users"),
+        API.get("/users", { params: { limit: USERS_PAGE_SIZE } }),
       ]);
       setStats(statsRes.data);
-      setUsers(usersRes.data);
+      setUsers(usersRes.data.items);
+      setNextCursor(usersRes.data.next_cursor);
     } catch (err) {
       console.error("Failed to fetch admin data", err);
     }
   };
 
+  // Keyset pagination: the next page starts after the last user id we have
+  const loadMoreUsers = async () => {
+    setLoadingUsers(true);
+    try {
+      const res = await API.get("/users", {
+        params: { limit: USERS_PAGE_SIZE, cursor: nextCursor },
+      });
+      setUsers((prev) => [...prev, ...res.data.items]);
+      setNextCursor(res.data.next_cursor);
+    } catch (err) {
+      console.error("Failed to fetch users", err);
+    } finally {
+      setLoadingUsers(false);
+    }
+  };
+
   const exportCSV = async () => {
     const res = await API.get("/admin/export-csv", { responseType: "blob" });
-    const url = window.URL.createObjectURL(res.data);
-    const a = document.createElement("a");
-    a.href = url;
-    a.download = "bragboard_report.csv";
-    a.click();
-    window.URL.revokeObjectURL(url);
+    saveBlob(res.data, "bragboard_report.csv");
+  };
+
+  // Small files are provisioned in the request; larger ones come back as a
+  // job (202) that we poll until the per-row report is ready
+  const uploadUsers = async () => {
+    if (!bulkFile) return;
+    setBulkStatus({ state: "uploading" });
+    try {
+      const res = await bulkCreateUsers(bulkFile);
+      if (res.status !== 202) {
+        setBulkStatus({ state: "done", summary: res.data.summary, report: res.data });
+        fetchAdminData();
+        return;
+      }
+      const jobId = res.data.job_id;
+      let job = res.data;
+      while (job.status === "queued" || job.status === "running") {
+        setBulkStatus({ state: job.status, progress: job.progress || 0, jobId });
+        await new Promise((resolve) => setTimeout(resolve, JOB_POLL_MS));
+        job = (await getJob(jobId)).data;
+      }
+      if (job.status === "done") {
+        setBulkStatus({ state: "done", summary: job.result.summary, jobId });
+        fetchAdminData();
+      } else {
+        setBulkStatus({ state: "failed", error: job.error });
+      }
+    } catch (err) {
+      setBulkStatus({ state: "failed", error: err.response?.data?.detail || "Upload failed" });
+    }
+  };
+
+  const downloadBulkReport = async () => {
+    const filename = "bragboard_provisioning_report.json";
+    if (bulkStatus.jobId) {
+      const res = await downloadJobResult(bulkStatus.jobId);
+      saveBlob(res.data, filename);
+    } else {
+      saveBlob(new Blob([JSON.stringify(bulkStatus.report, null, 2)], { type: "application/json" }), filename);
+    }
   };
 
   const deleteShoutout = async (id) => {
@@ -135,6 +204,48 @@ export default function AdminDashboard() {
         )}
       </div>
 
+      {/* BULK IMPORT */}
+      <div>
+        <h2 className="text-xl font-bold mb-4">📥 Bulk Import Users</h2>
+        <p className="text-sm text-gray-500 mb-3">
+          CSV with a name,email,password,department header (optional is_admin), or JSON lines.
+        </p>
+        <div className="flex items-center gap-4">
+          <input
+            type="file"
+            accept=".csv,.jsonl,.ndjson,.json"
+            onChange={(e) => setBulkFile(e.target.files[0] || null)}
+          />
+          <button
+            onClick={uploadUsers}
+            disabled={!bulkFile || ["uploading", "queued", "running"].includes(bulkStatus?.state)}
+            className="bg-indigo-600 text-white px-4 py-2 rounded disabled:opacity-50"
+          >
+            Import
+          </button>
+        </div>
+        {bulkStatus && (
+          <div className="mt-3 text-sm">
+            {bulkStatus.state === "uploading" && <p>Uploading…</p>}
+            {["queued", "running"].includes(bulkStatus.state) && (
+              <p>Importing in the background… {bulkStatus.progress}%</p>
+            )}
+            {bulkStatus.state === "failed" && (
+              <p className="text-red-600">Import failed: {bulkStatus.error}</p>
+            )}
+            {bulkStatus.state === "done" && (
+              <p>
+                Created {bulkStatus.summary.created}, skipped {bulkStatus.summary.skipped},
+                errors {bulkStatus.summary.errors} (of {bulkStatus.summary.total}).{" "}
+                <button onClick={downloadBulkReport} className="text-indigo-600 font-semibold">
+                  Download report
+                </button>
+              </p>
+            )}
+          </div>
+        )}
+      </div>
+
       {/* USERS */}
       <div>
         <h2 className="text-xl font-bold mb-4">👥 All Users</h2>
@@ -143,6 +254,15 @@ export default function AdminDashboard() {
             {u.name} — {u.is_admin ? "Admin" : "Employee"}
           </div>
         ))}
+        {nextCursor !== null && (
+          <button
+            onClick={loadMoreUsers}
+            disabled={loadingUsers}
+            className="mt-4 text-indigo-600 font-semibold disabled:opacity-50"
+          >
+            {loadingUsers ? "Loading…" : "Load more"}
+          </button>
+        )}
       </div>
 
     </div>